@@ -1,417 +1,418 @@
-# Updated app.py - Enhanced analysis with robust datetime handling, improved fetch reliability, and debugging:
-# - Fixed datetime mismatch using timezone.utc consistently.
-# - Added delay and additional headers to mitigate 403 Forbidden errors.
-# - Improved URL validation and fetch retry logic.
-# - Added detailed logging for each analysis step.
-# - Implemented try-except to catch and report analysis failures.
-# - Increased fetch timeout to 30s with 3 retries and 1s delay between attempts.
-# - Added /test route for static file debugging.
-
-from flask import Flask, render_template, request, jsonify
-from flask_socketio import SocketIO, emit
-from flask_cors import CORS
-from datetime import datetime, timezone
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse
-import requests, logging, time, ssl, socket
-import re
-
-app = Flask(__name__, static_folder='static', template_folder='templates')
-CORS(app)
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
-logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
-app.logger.setLevel(logging.DEBUG)  # Enable detailed logging
-
-# User-Agent list for rotation
-UA_LIST = [
-    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0.3 Safari/605.1.15",
-    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/88.0.4324.96 Safari/537.36",
-    "Mozilla/5.0 (iPhone; CPU iPhone OS 14_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Mobile/15E148 Safari/604.1"
-]
-WEIGHTS = {"security": 0.35, "performance": 0.35, "seo": 0.2, "accessibility": 0.1}
-
-# ------------------ Helpers ------------------
-
-def normalize_url(url: str) -> str:
-    if not url or not isinstance(url, str): return ""
-    url = url.strip()
-    if not url.startswith(("http://", "https://")): url = "https://" + url
-    try:
-        result = urlparse(url)
-        if not all([result.scheme, result.netloc]): return ""
-        return url
-    except ValueError:
-        return ""
-
-def hostname_from_url(url: str) -> str:
-    try:
-        return urlparse(url).hostname or url.split("//")[-1].split("/")[0]
-    except Exception:
-        return url
-
-def get_ssl_info(host: str):
-    try:
-        context = ssl.create_default_context()
-        with socket.create_connection((host, 443)) as sock:
-            with context.wrap_socket(sock, server_hostname=host) as ssock:
-                cert = ssock.getpeercert()
-                expiry_str = cert['notAfter']
-                expiry = datetime.strptime(expiry_str, '%b %d %H:%M:%S %Y %Z').replace(tzinfo=timezone.utc)
-                days_left = (expiry - datetime.now(timezone.utc)).days
-                issuer_tuple = dict(x[0] for x in cert['issuer'])
-                issuer = issuer_tuple.get('organizationName', issuer_tuple.get('commonName', 'Unknown'))
-                _, _, strength = ssock.cipher()  # name, protocol, bits
-                return True, issuer, days_left, strength
-    except Exception as e:
-        app.logger.error(f"SSL info failed for {host}: {e}")
-        return False, None, None, None
-
-def fetch_page(url: str):
-    if not url: return None, None
-    headers_base = {
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.5",
-        "Connection": "keep-alive",
-        "Upgrade-Insecure-Requests": "1"
-    }
-    for i, ua in enumerate(UA_LIST):
-        try:
-            headers = {**headers_base, "User-Agent": ua}
-            for attempt in range(3):
-                r = requests.get(url, timeout=30, headers=headers)
-                r.raise_for_status()
-                return r, round(r.elapsed.total_seconds(), 2)
-            app.logger.warning(f"Max retries exceeded for {url} with UA: {ua}")
-            time.sleep(1)  # Delay before next UA attempt
-        except requests.exceptions.RequestException as e:
-            app.logger.error(f"Fetch attempt {i+1} failed for {url}: {e}")
-            if i == len(UA_LIST) - 1:  # Last UA attempt
-                return None, None
-    return None, None
-
-def has_mixed_content(soup):
-    resources = (
-        soup.find_all(['img', 'script', 'iframe', 'audio', 'video', 'source'], src=True) +
-        soup.find_all('link', attrs={"rel": ["stylesheet", "preload", "icon"]}, href=True)
-    )
-    for res in resources:
-        url_attr = 'src' if res.has_attr('src') else 'href'
-        url_val = res[url_attr]
-        if url_val.startswith('http://'):
-            return True
-    return False
-
-def analyze_security(resp, ssl_ok, issuer, days_left, strength):
-    score = 0
-    issues = []
-    security_headers_list = []
-    if ssl_ok:
-        score += 40
-    else:
-        issues.append("Invalid SSL/TLS certificate.")
-    if resp and resp.status_code == 200:
-        headers = resp.headers
-        if "Content-Security-Policy" in headers:
-            score += 10
-            security_headers_list.append("CSP")
-        else:
-            issues.append("Missing Content-Security-Policy header.")
-        if "Strict-Transport-Security" in headers:
-            score += 10
-            security_headers_list.append("HSTS")
-        else:
-            issues.append("Missing Strict-Transport-Security header.")
-        if "X-Frame-Options" in headers:
-            score += 10
-            security_headers_list.append("XFO")
-        else:
-            issues.append("Missing X-Frame-Options header.")
-        if "X-Content-Type-Options" in headers:
-            score += 10
-            security_headers_list.append("XCTO")
-        else:
-            issues.append("Missing X-Content-Type-Options header.")
-        if "X-XSS-Protection" in headers:
-            score += 10
-            security_headers_list.append("XXSSP")
-        else:
-            issues.append("Missing X-XSS-Protection header.")
-        if "Referrer-Policy" in headers:
-            score += 10
-            security_headers_list.append("RP")
-        else:
-            issues.append("Missing Referrer-Policy header.")
-    mixed = has_mixed_content(BeautifulSoup(resp.text, "html.parser")) if resp else False
-    if mixed:
-        issues.append("Mixed content detected.")
-    else:
-        score += 10
-    security = {
-        "score": min(100, score),
-        "ssl_valid": ssl_ok,
-        "encryption_strength": strength if strength else "N/A",
-        "security_headers": ", ".join(security_headers_list) if security_headers_list else "None",
-        "vulnerabilities": 0,
-        "certificate_expiry": days_left if days_left is not None else "N/A",
-        "mixed_content": mixed,
-        "issues": issues
-    }
-    return security, issues
-
-def analyze_performance(resp, load_time):
-    issues = []
-    if not resp or resp.status_code != 200:
-        return {"score": 0, "issues": ["Unable to analyze performance"]}, issues
-    soup = BeautifulSoup(resp.text, "html.parser")
-    page_size = round(len(resp.content) / 1024, 1)  # KB
-    requests_count = 1 + len(soup.find_all('script', src=True)) + len(soup.find_all('link', rel='stylesheet', href=True)) + len(soup.find_all('img', src=True))
-    fcp_s = load_time * 0.8 if load_time else 1.8
-    lcp_s = load_time * 1.2 if load_time else 2.5
-    cls = 0.05
-    tti = load_time * 2 if load_time else 3.8
-    fid = 15
-    score = 0
-    if lcp_s < 2.5: score += 25
-    else: issues.append(f"High LCP: {lcp_s}s")
-    if fcp_s < 1.8: score += 25
-    else: issues.append(f"High FCP: {fcp_s}s")
-    if cls < 0.1: score += 20
-    else: issues.append(f"High CLS: {cls}")
-    if tti < 3.8: score += 15
-    else: issues.append(f"High TTI: {tti}s")
-    if fid < 100: score += 15
-    else: issues.append(f"High FID: {fid}ms")
-    performance = {
-        "lcp_s": round(lcp_s, 2),
-        "fcp_s": round(fcp_s, 2),
-        "cls": cls,
-        "tti": round(tti, 2),
-        "fid": fid,
-        "page_size": page_size,
-        "requests_count": requests_count,
-        "score": min(100, score),
-        "issues": issues
-    }
-    return performance, issues
-
-def analyze_seo(resp):
-    issues = []
-    if not resp or resp.status_code != 200:
-        return {"score": 0, "issues": ["Unable to analyze SEO"]}, issues
-    soup = BeautifulSoup(resp.text, "html.parser")
-    title_text = soup.title.string.strip() if soup.title else None
-    meta_desc = soup.find("meta", {"name": "description"})
-    meta_desc_length = len(meta_desc['content'].strip()) if meta_desc else 0
-    internal_links = len([a for a in soup.find_all('a', href=True) if a['href'] and not a['href'].startswith(('http', '//')) and not a['href'].startswith('#')])
-    score = 0
-    if title_text and 10 < len(title_text) < 60: score += 20
-    else: issues.append("Title missing or suboptimal length.")
-    if meta_desc_length and 50 < meta_desc_length < 160: score += 20
-    else: issues.append("Meta description missing or suboptimal length.")
-    if len(soup.find_all('h1')) == 1: score += 10
-    else: issues.append("Incorrect number of H1 tags.")
-    if internal_links > 5: score += 10
-    if soup.find("meta", {"name": "robots"}): score += 10
-    if soup.find("link", {"rel": "canonical"}): score += 10
-    seo = {
-        "title": title_text,
-        "meta_desc_length": meta_desc_length,
-        "keyword_density": "N/A",
-        "backlinks": "N/A",
-        "page_depth": "N/A",
-        "internal_links": internal_links,
-        "score": min(100, score),
-        "issues": issues
-    }
-    return seo, issues
-
-def analyze_accessibility(resp):
-    issues = []
-    if not resp or resp.status_code != 200:
-        return {"score": 0, "issues": ["Unable to analyze accessibility"]}, issues
-    soup = BeautifulSoup(resp.text, "html.parser")
-    images = soup.find_all('img')
-    alt_count = len([img for img in images if img.get('alt') and img['alt'].strip()])
-    alt_text_coverage = round(alt_count / len(images) * 100, 1) if images else 100.0
-    aria_usage = len(soup.find_all(attrs={"aria-label": True, "role": True}))
-    aria_percentage = round(aria_usage / max(len(soup.find_all()), 1) * 100, 1)
-    headings = [tag.name for tag in soup.find_all(re.compile('h[1-6]'))]
-    proper_headings = headings and headings[0] == 'h1'
-    score = 50
-    if alt_text_coverage > 90: score += 20
-    else: issues.append(f"Low alt text coverage: {alt_text_coverage}%")
-    if aria_usage > 0: score += 10
-    if soup.find('main') or soup.find(attrs={"role": "main"}): score += 10
-    if proper_headings: score += 10
-    else: issues.append("Improper heading structure.")
-    accessibility = {
-        "score": min(100, score),
-        "contrast_ratio": "N/A",
-        "alt_text_coverage": alt_text_coverage,
-        "keyboard_nav": "Supported" if soup.find_all('a', href=True) else "Limited",
-        "screen_reader": "Basic compatibility",
-        "color_blind_compatibility": "N/A",
-        "aria_usage": aria_percentage,
-        "issues": issues
-    }
-    return accessibility, issues
-
-# ------------------ Routes ------------------
-
-@app.route("/")
-def index(): return render_template("index.html")
-@app.route("/about.html") 
-def about(): return render_template("about.html")
-@app.route("/contact.html") 
-def contact(): return render_template("contact.html")
-@app.route("/privacy.html") 
-def privacy(): return render_template("privacy.html")
-@app.route("/terms.html") 
-def terms(): return render_template("terms.html")
-
-@app.route('/test')
-def test():
-    return app.send_static_file('style.css')
-
-@app.route("/audit", methods=["POST"])
-def audit():
-    data = request.get_json(silent=True) or {}
-    url = normalize_url(data.get("url", ""))
-    mode = data.get("mode", "desktop")
-    app.logger.info(f"Audit request: URL={url}, mode={mode}")
-    if not url: return jsonify({"error": "URL required"}), 400
-
-    start_time = time.time()
-    emit("audit_progress", {"progress": 5, "message": "Initializing audit..."}, namespace='/')
-    host = hostname_from_url(url)
-    emit("audit_progress", {"progress": 20, "message": "Checking SSL..."}, namespace='/')
-    ssl_ok, issuer, days_left, strength = get_ssl_info(host)
-    time.sleep(0.2)
-
-    emit("audit_progress", {"progress": 40, "message": "Fetching page content..."}, namespace='/')
-    resp, load_time = fetch_page(url)
-    if not resp:
-        app.logger.error(f"Fetch failed for {url}")
-        emit("audit_error", {"message": "Failed to fetch URL"}, namespace='/')
-        return jsonify({"error": "Failed to fetch URL"}), 500
-
-    emit("audit_progress", {"progress": 60, "message": "Analyzing security..."}, namespace='/')
-    sec_metrics, sec_issues = analyze_security(resp, ssl_ok, issuer, days_left, strength)
-    time.sleep(0.2)
-
-    emit("audit_progress", {"progress": 75, "message": "Analyzing performance, SEO & accessibility..."}, namespace='/')
-    try:
-        app.logger.debug("Starting performance analysis")
-        perf_metrics, perf_issues = analyze_performance(resp, load_time)
-        app.logger.debug("Performance analysis complete")
-        app.logger.debug("Starting SEO analysis")
-        seo_metrics, seo_issues = analyze_seo(resp)
-        app.logger.debug("SEO analysis complete")
-        app.logger.debug("Starting accessibility analysis")
-        acc_metrics, acc_issues = analyze_accessibility(resp)
-        app.logger.debug("Accessibility analysis complete")
-    except Exception as e:
-        app.logger.error(f"Analysis failed: {e}")
-        emit("audit_error", {"message": f"Analysis failed: {e}"}, namespace='/')
-        return jsonify({"error": f"Analysis failed: {e}"}), 500
-    time.sleep(0.2)
-
-    overall_score = round(sec_metrics["score"] * WEIGHTS["security"] + 
-                          perf_metrics["score"] * WEIGHTS["performance"] + 
-                          seo_metrics["score"] * WEIGHTS["seo"] + 
-                          acc_metrics["score"] * WEIGHTS["accessibility"])
-    grade = ("A" if overall_score >= 90 else "B" if overall_score >= 80 else "C" if overall_score >= 70 else "D" if overall_score >= 60 else "F")
-
-    end_time = time.time()
-    audit_duration = round(end_time - start_time, 1)
-
-    payload = {
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-        "url": url,
-        "mode": mode,
-        "status": "success",
-        "overall": {"score": overall_score, "grade": grade, "response_time": round(load_time * 1000, 0) if load_time else "N/A", 
-                    "pages_scanned": 1, "audit_duration": audit_duration, "uptime": "N/A", "error_rate": "N/A"},
-        "security": sec_metrics,
-        "performance": perf_metrics,
-        "seo": seo_metrics,
-        "accessibility": acc_metrics,
-        "issues": sorted(set(sec_issues + perf_issues + seo_issues + acc_issues))
-    }
-    emit("audit_progress", {"progress": 100, "message": "Completing audit..."}, namespace='/')
-    time.sleep(0.1)
-    emit("audit_complete", payload, namespace='/')
-    return jsonify(payload)
-
-@socketio.on("start_audit")
-def handle_audit(data):
-    url = normalize_url(data.get("url", ""))
-    mode = data.get("mode", "desktop")
-    app.logger.info(f"Socket audit request: URL={url}, mode={mode}")
-    if not url: 
-        emit("audit_error", {"message": "URL required"}, namespace='/')
-        return
-
-    emit("audit_progress", {"progress": 5, "message": "Initializing audit..."}, namespace='/')
-    start_time = time.time()
-    host = hostname_from_url(url)
-    emit("audit_progress", {"progress": 20, "message": "Checking SSL..."}, namespace='/')
-    ssl_ok, issuer, days_left, strength = get_ssl_info(host)
-    time.sleep(0.2)
-
-    emit("audit_progress", {"progress": 40, "message": "Fetching page content..."}, namespace='/')
-    resp, load_time = fetch_page(url)
-    if not resp:
-        app.logger.error(f"Fetch failed for {url}")
-        emit("audit_error", {"message": "Failed to fetch URL"}, namespace='/')
-        return
-
-    emit("audit_progress", {"progress": 60, "message": "Analyzing security..."}, namespace='/')
-    sec_metrics, sec_issues = analyze_security(resp, ssl_ok, issuer, days_left, strength)
-    time.sleep(0.2)
-
-    emit("audit_progress", {"progress": 75, "message": "Analyzing performance, SEO & accessibility..."}, namespace='/')
-    try:
-        app.logger.debug("Starting performance analysis")
-        perf_metrics, perf_issues = analyze_performance(resp, load_time)
-        app.logger.debug("Performance analysis complete")
-        app.logger.debug("Starting SEO analysis")
-        seo_metrics, seo_issues = analyze_seo(resp)
-        app.logger.debug("SEO analysis complete")
-        app.logger.debug("Starting accessibility analysis")
-        acc_metrics, acc_issues = analyze_accessibility(resp)
-        app.logger.debug("Accessibility analysis complete")
-    except Exception as e:
-        app.logger.error(f"Analysis failed: {e}")
-        emit("audit_error", {"message": f"Analysis failed: {e}"}, namespace='/')
-        return
-    time.sleep(0.2)
-
-    overall_score = round(sec_metrics["score"] * WEIGHTS["security"] + 
-                          perf_metrics["score"] * WEIGHTS["performance"] + 
-                          seo_metrics["score"] * WEIGHTS["seo"] + 
-                          acc_metrics["score"] * WEIGHTS["accessibility"])
-    grade = ("A" if overall_score >= 90 else "B" if overall_score >= 80 else "C" if overall_score >= 70 else "D" if overall_score >= 60 else "F")
-
-    end_time = time.time()
-    audit_duration = round(end_time - start_time, 1)
-
-    emit("audit_progress", {"progress": 100, "message": "Completing audit..."}, namespace='/')
-    time.sleep(0.1)
-    emit("audit_complete", {
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-        "url": url,
-        "mode": mode,
-        "status": "success",
-        "overall": {"score": overall_score, "grade": grade, "response_time": round(load_time * 1000, 0) if load_time else "N/A", 
-                    "pages_scanned": 1, "audit_duration": audit_duration, "uptime": "N/A", "error_rate": "N/A"},
-        "security": sec_metrics,
-        "performance": perf_metrics,
-        "seo": seo_metrics,
-        "accessibility": acc_metrics,
-        "issues": sorted(set(sec_issues + perf_issues + seo_issues + acc_issues))
-    }, namespace='/')
-
-if __name__ == "__main__":
-    socketio.run(app, host="0.0.0.0", port=5000, debug=True)
\ No newline at end of file
+# Updated app.py - Enhanced analysis with robust datetime handling, improved fetch reliability, and debugging:
+# - Fixed datetime mismatch using timezone.utc consistently.
+# - Added delay and additional headers to mitigate 403 Forbidden errors.
+# - Improved URL validation and fetch retry logic.
+# - Added detailed logging for each analysis step.
+# - Implemented try-except to catch and report analysis failures.
+# - Fetches go through a pooled session with a 30s timeout and urllib3 retries
+#   (3 attempts, 0.5 backoff on 429/5xx); User-Agent rotation only on 403.
+# - Added /test route for static file debugging.
+
+# Must run before any other import so sockets/threads are green from the start
+import eventlet
+eventlet.monkey_patch()
+
+from flask import Flask, render_template, request, jsonify
+from flask_socketio import SocketIO, emit
+from flask_cors import CORS
+from datetime import datetime, timezone
+from bs4 import BeautifulSoup
+from selectolax.parser import HTMLParser
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from cachetools import TTLCache
+from cachetools.func import ttl_cache
+import requests, logging, time, ssl, socket, threading
+
+app = Flask(__name__, static_folder='static', template_folder='templates')
+CORS(app)
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode='eventlet')
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+app.logger.setLevel(logging.DEBUG)  # Enable detailed logging
+
+# User-Agent list for rotation
+UA_LIST = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0.3 Safari/605.1.15",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/88.0.4324.96 Safari/537.36",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 14_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Mobile/15E148 Safari/604.1"
+]
+WEIGHTS = {"security": 0.35, "performance": 0.35, "seo": 0.2, "accessibility": 0.1}
+MAX_PAGE_BYTES = 5_000_000  # cap per page so a huge or malicious URL can't exhaust memory
+
+# Shared session: keep-alive + TLS reuse across audits, retries handled by urllib3
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=50, pool_maxsize=100,
+                       max_retries=Retry(total=3, backoff_factor=0.5,
+                                         status_forcelist=[429, 500, 502, 503, 504]))
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+
+# Completed audit payloads keyed on (url, mode); repeat audits inside the TTL
+# window skip the handshake, fetch and parsing entirely. TTLCache is not
+# thread-safe, so all access goes through the lock.
+_RESULT_CACHE = TTLCache(maxsize=512, ttl=120)
+_RESULT_CACHE_LOCK = threading.Lock()
+
+# ------------------ Helpers ------------------
+
+def normalize_url(url: str):
+    """Validate the URL and return (normalized_url, hostname) from a single parse."""
+    if not url or not isinstance(url, str): return "", ""
+    url = url.strip()
+    if not url.startswith(("http://", "https://")): url = "https://" + url
+    try:
+        result = urlparse(url)
+        if not all([result.scheme, result.netloc]): return "", ""
+        return url, result.hostname or result.netloc
+    except ValueError:
+        return "", ""
+
+@ttl_cache(maxsize=1024, ttl=300)
+def _probe_ssl(host: str):
+    # Certificates change on the order of months; a 5 minute cache skips the
+    # TLS handshake entirely on repeat probes of the same host. Raises on
+    # failure so only successful probes are cached.
+    context = ssl.create_default_context()
+    with socket.create_connection((host, 443)) as sock:
+        with context.wrap_socket(sock, server_hostname=host) as ssock:
+            cert = ssock.getpeercert()
+            expiry_ts = ssl.cert_time_to_seconds(cert['notAfter'])
+            days_left = int((expiry_ts - time.time()) // 86400)
+            issuer_tuple = dict(x[0] for x in cert['issuer'])
+            issuer = issuer_tuple.get('organizationName', issuer_tuple.get('commonName', 'Unknown'))
+            _, _, strength = ssock.cipher()  # name, protocol, bits
+            return True, issuer, days_left, strength
+
+def get_ssl_info(host: str):
+    try:
+        return _probe_ssl(host)
+    except Exception as e:
+        app.logger.error(f"SSL info failed for {host}: {e}")
+        return False, None, None, None
+
+def fetch_page(url: str):
+    if not url: return None, None
+    headers_base = {
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+        "Accept-Language": "en-US,en;q=0.5",
+        "Connection": "keep-alive",
+        "Upgrade-Insecure-Requests": "1"
+    }
+    for i, ua in enumerate(UA_LIST):
+        try:
+            r = SESSION.get(url, stream=True, timeout=30, headers={**headers_base, "User-Agent": ua})
+            if r.status_code == 403 and i < len(UA_LIST) - 1:
+                app.logger.warning(f"403 for {url} with UA {i+1}, rotating User-Agent")
+                r.close()
+                continue
+            r.raise_for_status()
+            buf = bytearray()
+            for chunk in r.iter_content(65536):
+                buf += chunk
+                if len(buf) > MAX_PAGE_BYTES:
+                    app.logger.warning(f"Truncating {url} at {MAX_PAGE_BYTES} bytes")
+                    r.close()
+                    break
+            # Stash the capped body so downstream resp.content/resp.text reads see it
+            r._content = bytes(buf)
+            return r, round(r.elapsed.total_seconds(), 2)
+        except requests.exceptions.RequestException as e:
+            app.logger.error(f"Fetch failed for {url} (UA {i+1}): {e}")
+            return None, None
+    return None, None
+
+_RESOURCE_SELECTOR = ('img[src], script[src], iframe[src], audio[src], video[src], source[src], '
+                      'link[href]')
+
+def collect_resources(tree):
+    """Single CSS pass over the tree; the node list is shared by the
+    mixed-content check and the performance request count."""
+    return tree.css(_RESOURCE_SELECTOR)
+
+_MIXED_MARKERS = (b'src="http://', b"src='http://", b'href="http://', b"href='http://")
+
+def may_have_mixed_content(body: bytes) -> bool:
+    """Fast negative: a quoted http:// src/href appears verbatim in the raw
+    bytes, so a miss here rules out mixed content without any DOM work."""
+    return any(marker in body for marker in _MIXED_MARKERS)
+
+def has_mixed_content(resources):
+    for node in resources:
+        if node.tag == 'link':
+            rel = (node.attributes.get('rel') or '').split()
+            if not any(r in ('stylesheet', 'preload', 'icon') for r in rel):
+                continue
+            url_val = node.attributes.get('href') or ''
+        else:
+            url_val = node.attributes.get('src') or ''
+        if url_val.startswith('http://'):
+            return True
+    return False
+
+SECURITY_HEADERS = (
+    ("Content-Security-Policy", "CSP"),
+    ("Strict-Transport-Security", "HSTS"),
+    ("X-Frame-Options", "XFO"),
+    ("X-Content-Type-Options", "XCTO"),
+    ("X-XSS-Protection", "XXSSP"),
+    ("Referrer-Policy", "RP"),
+)
+
+def analyze_security(resp, resources, ssl_ok, issuer, days_left, strength):
+    score = 0
+    issues = []
+    security_headers_list = []
+    if ssl_ok:
+        score += 40
+    else:
+        issues.append("Invalid SSL/TLS certificate.")
+    if resp and resp.status_code == 200:
+        headers = resp.headers  # CaseInsensitiveDict, so no lowercasing needed
+        for name, tag in SECURITY_HEADERS:
+            if name in headers:
+                score += 10
+                security_headers_list.append(tag)
+            else:
+                issues.append(f"Missing {name} header.")
+    if resp is not None and resources is not None and may_have_mixed_content(resp.content):
+        mixed = has_mixed_content(resources)  # confirm the hit on real nodes
+    else:
+        mixed = False
+    if mixed:
+        issues.append("Mixed content detected.")
+    else:
+        score += 10
+    security = {
+        "score": min(100, score),
+        "ssl_valid": ssl_ok,
+        "encryption_strength": strength if strength else "N/A",
+        "security_headers": ", ".join(security_headers_list) if security_headers_list else "None",
+        "vulnerabilities": 0,
+        "certificate_expiry": days_left if days_left is not None else "N/A",
+        "mixed_content": mixed,
+        "issues": issues
+    }
+    return security, issues
+
+def analyze_performance(resp, resources, load_time):
+    issues = []
+    if not resp or resp.status_code != 200:
+        return {"score": 0, "issues": ["Unable to analyze performance"]}, issues
+    page_size = round(len(resp.content) / 1024, 1)  # KB
+    requests_count = 1  # the page itself
+    for node in resources:
+        tag = node.tag
+        if tag in ('script', 'img'):
+            requests_count += 1
+        elif tag == 'link' and 'stylesheet' in (node.attributes.get('rel') or ''):
+            requests_count += 1
+    fcp_s = load_time * 0.8 if load_time else 1.8
+    lcp_s = load_time * 1.2 if load_time else 2.5
+    cls = 0.05
+    tti = load_time * 2 if load_time else 3.8
+    fid = 15
+    score = 0
+    if lcp_s < 2.5: score += 25
+    else: issues.append(f"High LCP: {lcp_s}s")
+    if fcp_s < 1.8: score += 25
+    else: issues.append(f"High FCP: {fcp_s}s")
+    if cls < 0.1: score += 20
+    else: issues.append(f"High CLS: {cls}")
+    if tti < 3.8: score += 15
+    else: issues.append(f"High TTI: {tti}s")
+    if fid < 100: score += 15
+    else: issues.append(f"High FID: {fid}ms")
+    performance = {
+        "lcp_s": round(lcp_s, 2),
+        "fcp_s": round(fcp_s, 2),
+        "cls": cls,
+        "tti": round(tti, 2),
+        "fid": fid,
+        "page_size": page_size,
+        "requests_count": requests_count,
+        "score": min(100, score),
+        "issues": issues
+    }
+    return performance, issues
+
+def analyze_seo(soup):
+    issues = []
+    if soup is None:
+        return {"score": 0, "issues": ["Unable to analyze SEO"]}, issues
+    title_text = soup.title.string.strip() if soup.title else None
+    meta_desc = soup.find("meta", {"name": "description"})
+    meta_desc_length = len(meta_desc['content'].strip()) if meta_desc else 0
+    internal_links = len([a for a in soup.find_all('a', href=True) if a['href'] and not a['href'].startswith(('http', '//')) and not a['href'].startswith('#')])
+    score = 0
+    if title_text and 10 < len(title_text) < 60: score += 20
+    else: issues.append("Title missing or suboptimal length.")
+    if meta_desc_length and 50 < meta_desc_length < 160: score += 20
+    else: issues.append("Meta description missing or suboptimal length.")
+    if len(soup.find_all('h1')) == 1: score += 10
+    else: issues.append("Incorrect number of H1 tags.")
+    if internal_links > 5: score += 10
+    if soup.find("meta", {"name": "robots"}): score += 10
+    if soup.find("link", {"rel": "canonical"}): score += 10
+    seo = {
+        "title": title_text,
+        "meta_desc_length": meta_desc_length,
+        "keyword_density": "N/A",
+        "backlinks": "N/A",
+        "page_depth": "N/A",
+        "internal_links": internal_links,
+        "score": min(100, score),
+        "issues": issues
+    }
+    return seo, issues
+
+def analyze_accessibility(soup):
+    issues = []
+    if soup is None:
+        return {"score": 0, "issues": ["Unable to analyze accessibility"]}, issues
+    images = soup.find_all('img')
+    alt_count = len([img for img in images if img.get('alt') and img['alt'].strip()])
+    alt_text_coverage = round(alt_count / len(images) * 100, 1) if images else 100.0
+    aria_usage = len(soup.find_all(attrs={"aria-label": True, "role": True}))
+    aria_percentage = round(aria_usage / max(len(soup.find_all()), 1) * 100, 1)
+    headings = [tag.name for tag in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])]
+    proper_headings = headings and headings[0] == 'h1'
+    score = 50
+    if alt_text_coverage > 90: score += 20
+    else: issues.append(f"Low alt text coverage: {alt_text_coverage}%")
+    if aria_usage > 0: score += 10
+    if soup.find('main') or soup.find(attrs={"role": "main"}): score += 10
+    if proper_headings: score += 10
+    else: issues.append("Improper heading structure.")
+    accessibility = {
+        "score": min(100, score),
+        "contrast_ratio": "N/A",
+        "alt_text_coverage": alt_text_coverage,
+        "keyboard_nav": "Supported" if soup.find_all('a', href=True) else "Limited",
+        "screen_reader": "Basic compatibility",
+        "color_blind_compatibility": "N/A",
+        "aria_usage": aria_percentage,
+        "issues": issues
+    }
+    return accessibility, issues
+
+# ------------------ Routes ------------------
+
+@app.route("/")
+def index(): return render_template("index.html")
+@app.route("/about.html") 
+def about(): return render_template("about.html")
+@app.route("/contact.html") 
+def contact(): return render_template("contact.html")
+@app.route("/privacy.html") 
+def privacy(): return render_template("privacy.html")
+@app.route("/terms.html") 
+def terms(): return render_template("terms.html")
+
+@app.route('/test')
+def test():
+    return app.send_static_file('style.css')
+
+def _run_audit(url, host, mode, emit_fn):
+    """Shared audit pipeline for the HTTP and SocketIO entry points.
+
+    Returns (payload, error_message); exactly one of the two is None.
+    """
+    with _RESULT_CACHE_LOCK:
+        cached = _RESULT_CACHE.get((url, mode))
+    if cached is not None:
+        app.logger.info(f"Cache hit for {url} ({mode})")
+        emit_fn("audit_progress", {"progress": 100, "message": "Completing audit..."})
+        emit_fn("audit_complete", cached)
+        return cached, None
+
+    start_time = time.time()
+    emit_fn("audit_progress", {"progress": 5, "message": "Initializing audit..."})
+    emit_fn("audit_progress", {"progress": 20, "message": "Checking SSL..."})
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        ssl_future = executor.submit(get_ssl_info, host)
+        fetch_future = executor.submit(fetch_page, url)
+        ssl_ok, issuer, days_left, strength = ssl_future.result()
+        emit_fn("audit_progress", {"progress": 40, "message": "Fetching page content..."})
+        resp, load_time = fetch_future.result()
+    if not resp:
+        app.logger.error(f"Fetch failed for {url}")
+        emit_fn("audit_error", {"message": "Failed to fetch URL"})
+        return None, "Failed to fetch URL"
+    soup = BeautifulSoup(resp.content, "lxml", from_encoding=resp.encoding or "utf-8")
+    resources = collect_resources(HTMLParser(resp.content))
+
+    emit_fn("audit_progress", {"progress": 60, "message": "Analyzing security..."})
+    try:
+        app.logger.debug("Starting analysis")
+        # The analyzers are CPU-bound tree walks; under eventlet a thread pool
+        # would just be greenlets on one OS thread, so run them directly.
+        sec_metrics, sec_issues = analyze_security(resp, resources, ssl_ok, issuer, days_left, strength)
+        emit_fn("audit_progress", {"progress": 75, "message": "Analyzing performance, SEO & accessibility..."})
+        perf_metrics, perf_issues = analyze_performance(resp, resources, load_time)
+        seo_metrics, seo_issues = analyze_seo(soup)
+        acc_metrics, acc_issues = analyze_accessibility(soup)
+        app.logger.debug("Analysis complete")
+    except Exception as e:
+        app.logger.error(f"Analysis failed: {e}")
+        emit_fn("audit_error", {"message": f"Analysis failed: {e}"})
+        return None, f"Analysis failed: {e}"
+
+    overall_score = round(sec_metrics["score"] * WEIGHTS["security"] +
+                          perf_metrics["score"] * WEIGHTS["performance"] +
+                          seo_metrics["score"] * WEIGHTS["seo"] +
+                          acc_metrics["score"] * WEIGHTS["accessibility"])
+    grade = ("A" if overall_score >= 90 else "B" if overall_score >= 80 else "C" if overall_score >= 70 else "D" if overall_score >= 60 else "F")
+
+    end_time = time.time()
+    audit_duration = round(end_time - start_time, 1)
+
+    payload = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "url": url,
+        "mode": mode,
+        "status": "success",
+        "overall": {"score": overall_score, "grade": grade, "response_time": round(load_time * 1000, 0) if load_time else "N/A",
+                    "pages_scanned": 1, "audit_duration": audit_duration, "uptime": "N/A", "error_rate": "N/A"},
+        "security": sec_metrics,
+        "performance": perf_metrics,
+        "seo": seo_metrics,
+        "accessibility": acc_metrics,
+        "issues": list(dict.fromkeys(sec_issues + perf_issues + seo_issues + acc_issues))
+    }
+    with _RESULT_CACHE_LOCK:
+        _RESULT_CACHE[(url, mode)] = payload
+    emit_fn("audit_progress", {"progress": 100, "message": "Completing audit..."})
+    emit_fn("audit_complete", payload)
+    return payload, None
+
+@app.route("/audit", methods=["POST"])
+def audit():
+    data = request.get_json(silent=True) or {}
+    url, host = normalize_url(data.get("url", ""))
+    mode = data.get("mode", "desktop")
+    app.logger.info(f"Audit request: URL={url}, mode={mode}")
+    if not url: return jsonify({"error": "URL required"}), 400
+
+    # Plain HTTP has no socket context, so use the server-side socketio.emit;
+    # the context-bound emit would raise before _run_audit could return.
+    payload, error = _run_audit(url, host, mode, lambda ev, p: socketio.emit(ev, p, namespace='/'))
+    if error:
+        return jsonify({"error": error}), 500
+    return jsonify(payload)
+
+@socketio.on("start_audit")
+def handle_audit(data):
+    url, host = normalize_url(data.get("url", ""))
+    mode = data.get("mode", "desktop")
+    app.logger.info(f"Socket audit request: URL={url}, mode={mode}")
+    if not url:
+        emit("audit_error", {"message": "URL required"}, namespace='/')
+        return
+
+    _run_audit(url, host, mode, lambda ev, p: emit(ev, p, namespace='/'))
+
+if __name__ == "__main__":
+    socketio.run(app, host="0.0.0.0", port=5000)
\ No newline at end of file